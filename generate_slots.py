@@ -1,12 +1,9 @@
-import json
-from datetime import datetime, timedelta
-import random
+from datetime import date, datetime
 
-def minutes_to_time_str(minutes):
-    """분을 'HH:MM' 형식의 문자열로 변환합니다."""
-    hours = minutes // 60
-    mins = minutes % 60
-    return f"{hours:02d}:{mins:02d}"
+import numpy as np
+
+from jsonio import dumps_compact, dumps_indented
+from slot import Slot, minutes_to_time_str
 
 def generate_slots_data_sorted_by_exam(start_date_str, end_date_str, booked_percentage=20, output_format_mode=0):
     """
@@ -30,34 +27,43 @@ def generate_slots_data_sorted_by_exam(start_date_str, end_date_str, booked_perc
         print("❌ 오류: 시작 날짜가 끝 날짜보다 늦을 수 없습니다.")
         return
     
-    # --- 슬롯 생성 로직 (이전과 동일) ---
-    
-    all_slots = []
-    slot_id_counter = 1
+    # --- 슬롯 생성 로직 ---
+    # (날짜, 시작 시각, 검사) 격자를 NumPy 배열로 한 번에 만들고, 종료 시각이 17:00를 넘는 조합만 제외
     first_date = current_date
+    day_offsets = np.arange((end_date - first_date).days + 1)
+    day_offsets = day_offsets[(first_date.weekday() + day_offsets) % 7 < 5] # 주말 제외
 
-    while current_date <= end_date:
-        if current_date.weekday() < 5: 
-            for start_min_of_day in range(540, 1020, 30): 
-                for exam_name, duration in EXAMS_INFO.items():
-                    slot_start_min = start_min_of_day
-                    slot_end_min = start_min_of_day + duration
-                    
-                    if slot_end_min > 1020: 
-                        continue
+    # 날짜 문자열과 'day' 값은 슬롯마다가 아니라 날짜마다 한 번만 계산
+    # (strftime 대신 로케일 처리를 거치지 않는 date.isoformat 사용)
+    day_numbers = (day_offsets + 1).tolist()
+    date_ords = (day_offsets + first_date.toordinal()).tolist()
+    date_strs = [date.fromordinal(date_ord).isoformat() for date_ord in date_ords]
 
-                    all_slots.append({
-                        "id": slot_id_counter,
-                        "exam": exam_name,
-                        "date": current_date.strftime("%Y-%m-%d"),
-                        "day": (current_date - first_date).days + 1,
-                        "start_min": slot_start_min,
-                        "end_min": slot_end_min,
-                        "is_available": True
-                    })
-                    slot_id_counter += 1
-        
-        current_date += timedelta(days=1)
+    exam_names = list(EXAMS_INFO)
+    durations = np.array(list(EXAMS_INFO.values()))
+
+    # indexing='ij'로 (날짜, 시작 시각, 검사) 순서를 유지해 기존과 같은 순서로 id를 부여
+    day_idx, start_mins, exam_idx = np.meshgrid(
+        np.arange(len(day_offsets)), np.arange(540, 1020, 30), np.arange(len(exam_names)), indexing='ij'
+    )
+    end_mins = start_mins + durations[exam_idx]
+    in_hours = end_mins <= 1020
+
+    all_slots = [
+        Slot(
+            id=slot_id,
+            exam=exam_names[e],
+            date=date_strs[d],
+            date_ord=date_ords[d],
+            day=day_numbers[d],
+            start_min=start_min,
+            end_min=end_min
+        )
+        for slot_id, (d, start_min, end_min, e) in enumerate(zip(
+            day_idx[in_hours].tolist(), start_mins[in_hours].tolist(),
+            end_mins[in_hours].tolist(), exam_idx[in_hours].tolist()
+        ), start=1)
+    ]
 
     total_slots = len(all_slots)
     if total_slots == 0:
@@ -66,42 +72,49 @@ def generate_slots_data_sorted_by_exam(start_date_str, end_date_str, booked_perc
         return
         
     slots_to_book = int(total_slots * (booked_percentage / 100))
-    booked_indices = random.sample(range(total_slots), slots_to_book)
+    # 중복 없는 무작위 인덱스 추출은 NumPy Generator로 C 수준에서 한 번에 처리
+    rng = np.random.default_rng()
+    booked_indices = rng.choice(total_slots, slots_to_book, replace=False)
     
-    for index in booked_indices:
-        all_slots[index]['is_available'] = False
+    for index in booked_indices.tolist():
+        all_slots[index].is_available = False
         
+    # 표시 문자열은 (시작, 종료, 예약 여부) 조합마다 하나뿐이므로 조합별로 한 번만 만들어 재사용
+    display_cache = {}
     for slot in all_slots:
-        start_time_str = minutes_to_time_str(slot['start_min'])
-        end_time_str = minutes_to_time_str(slot['end_min'])
-        status = "예약 가능" if slot['is_available'] else "예약됨"
-        slot['time_status_display'] = f"{start_time_str}-{end_time_str}, {status}"
+        key = (slot.start_min, slot.end_min, slot.is_available)
+        display = display_cache.get(key)
+        if display is None:
+            start_time_str = minutes_to_time_str(slot.start_min)
+            end_time_str = minutes_to_time_str(slot.end_min)
+            status = "예약 가능" if slot.is_available else "예약됨"
+            display = f"{start_time_str}-{end_time_str}, {status}"
+            display_cache[key] = display
+        slot.time_status_display = display
 
     print(f"기간: {start_date_str} ~ {end_date_str}")
     print(f"총 {total_slots}개 슬롯 중 {slots_to_book}개 ({booked_percentage}%)가 예약됨 처리되었습니다.")
 
     # --- 정렬 및 출력 형식 제어 (로직 동일) ---
-    all_slots.sort(key=lambda x: (x['exam'], x['date'], x['start_min']))
+    all_slots.sort(key=lambda x: (x.exam, x.date_ord, x.start_min))
     
     output_filename = 'slots_data.json'
     
     if output_format_mode == 0:
-        indent_level = 4
-        separators = (',', ': ')
         print("💡 출력 모드 0: 항목별 줄 바꿈 및 들여쓰기 (개발/디버깅용)")
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(all_slots, f, indent=indent_level, separators=separators, ensure_ascii=False)
+        with open(output_filename, 'wb') as f:
+            f.write(dumps_indented([slot.to_dict() for slot in all_slots]))
             
     else: # output_format_mode == 1 (ID별 줄 바꿈 모드)
         print("💡 출력 모드 1: ID별 줄 바꿈 (압축 + 가독성 최적화)")
-        json_strings = []
-        for slot in all_slots:
-            compressed_slot = json.dumps(slot, separators=(',', ':'), ensure_ascii=False)
-            json_strings.append(compressed_slot)
-            
-        file_content = "[\n" + ",\n".join(json_strings) + "\n]"
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            f.write(file_content)
+        # 전체 문자열을 메모리에 모으지 않고 슬롯 단위로 바로 기록 (1MB 버퍼로 쓰기 횟수는 최소화)
+        with open(output_filename, 'wb', buffering=1 << 20) as f:
+            f.write(b"[\n")
+            for i, slot in enumerate(all_slots):
+                if i:
+                    f.write(b",\n")
+                f.write(dumps_compact(slot.to_dict()))
+            f.write(b"\n]")
 
     print(f"✅ 정렬 및 형식 제어된 {output_filename} 파일이 성공적으로 생성되었습니다.")
 
@@ -0,0 +1,34 @@
+import json
+
+try:
+    import orjson # C 구현 JSON 라이브러리 (설치되어 있으면 사용)
+except ImportError:
+    orjson = None
+
+
+# -----------------------------
+# JSON 입출력 공용 함수
+# - orjson이 설치되어 있으면 orjson으로, 없으면 표준 json 모듈로 처리합니다.
+# - 두 경로 모두 같은 바이트열을 만들어내므로 출력 파일은 설치 여부와 무관하게 동일합니다.
+# -----------------------------
+def read_json(filename):
+    """JSON 파일 전체를 읽어 파이썬 객체(list 또는 dict)로 반환합니다."""
+    if orjson is not None:
+        with open(filename, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dumps_compact(obj):
+    """객체를 공백 없는 JSON 바이트열(UTF-8)로 직렬화합니다."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def dumps_indented(obj):
+    """객체를 2칸 들여쓰기 JSON 바이트열(UTF-8)로 직렬화합니다."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
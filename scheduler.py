@@ -1,31 +1,131 @@
-import json
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
 from ortools.sat.python import cp_model
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+
+import numpy as np
+
+try:
+    from numba import njit # JIT 컴파일러 (설치되어 있으면 사용)
+except ImportError:
+    njit = None
+
+from jsonio import read_json
+from slot import Slot, SlotColumns, minutes_to_time_str
 
 # -----------------------------
 # Helper functions
 # -----------------------------
+@lru_cache(maxsize=16)
+def _load_cached(filename, mtime_ns):
+    """
+    load_data의 캐시 본체. (파일 경로, 수정 시각) 조합마다 한 번만 파일을 읽고 파싱합니다.
+    mtime_ns는 캐시 키로만 사용되며, 파일이 수정되면 키가 바뀌어 다시 읽게 됩니다.
+    """
+    return read_json(filename)
+
+
 def load_data(filename):
     """
     JSON 파일을 읽어 파이썬 객체로 반환합니다.
 
     - filename: JSON 파일 경로 (문자열)
-    반환값: json.load로 읽어들인 파이썬 자료구조 (list 또는 dict)
+    반환값: JSON을 파싱한 파이썬 자료구조 (list 또는 dict)
+    orjson이 설치되어 있으면 orjson으로, 없으면 표준 json 모듈로 파싱합니다.
+
+    같은 파일을 반복해서 읽으면 파일이 수정되지 않은 한 캐시된 객체를 그대로 반환하므로,
+    호출하는 쪽에서는 반환값을 수정하지 말고 읽기 전용으로 다뤄야 합니다.
+    """
+    return _load_cached(filename, os.stat(filename).st_mtime_ns)
+
+
+@lru_cache(maxsize=16)
+def _load_slots_cached(filename, mtime_ns):
+    """
+    파싱된 JSON을 Slot 튜플로 변환해 보관합니다. (파일 경로, 수정 시각) 조합마다 한 번만 변환합니다.
+    JSON dict는 이때 한 번만 Slot으로 변환되며, 날짜도 함께 파싱(date_ord)됩니다.
+    """
+    return tuple(Slot.from_dict(record) for record in _load_cached(filename, mtime_ns))
+
+
+@lru_cache(maxsize=16)
+def _load_slot_columns_cached(filename, mtime_ns):
+    """load_slots_with_columns의 캐시 본체. 캐시된 Slot 튜플로부터 열 배열을 만듭니다."""
+    return SlotColumns.from_slots(_load_slots_cached(filename, mtime_ns))
+
+
+def load_slots_with_columns(filename):
+    """
+    슬롯 JSON 파일을 읽어 (Slot 튜플, SlotColumns) 쌍을 반환합니다.
+
+    두 값은 같은 파일 버전에서 만들어지므로 SlotColumns의 i번째 원소가 Slot 튜플의 i번째 슬롯에 대응합니다.
+    load_data와 마찬가지로 결과가 캐시되므로 읽기 전용으로 다뤄야 합니다.
     """
-    with open(filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    mtime_ns = os.stat(filename).st_mtime_ns
+    return _load_slots_cached(filename, mtime_ns), _load_slot_columns_cached(filename, mtime_ns)
 
 
-def minutes_to_time_str(minutes):
+def available_cpu_count():
     """
-    분 단위 정수를 'HH:MM' 형식의 문자열로 변환합니다.
+    이 프로세스가 실제로 사용할 수 있는 CPU 수를 반환합니다.
 
-    예: 75 -> '01:15'
-    이 함수는 출력용으로만 사용되며 내부 계산은 분 단위를 유지합니다.
+    os.cpu_count()는 호스트 전체 CPU 수를 돌려주므로, 가능하면 CPU affinity(컨테이너 제한 포함)를 기준으로 셉니다.
     """
-    hours = minutes // 60
-    mins = minutes % 60
-    return f"{hours:02d}:{mins:02d}"
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 8
+
+
+def forbidden_gap_pairs(pre_dates, pre_ends, post_dates, post_starts, gap):
+    """
+    같은 날짜에서 '선행 종료시간 + gap > 후속 시작시간'이 되어 함께 선택될 수 없는 (선행, 후속) 쌍을 찾습니다.
+
+    - pre_dates, pre_ends: 선행 슬롯의 날짜 서수와 종료 분. (날짜, 종료 분) 순으로 정렬되어 있어야 함
+    - post_dates, post_starts: 후속 슬롯의 날짜 서수와 시작 분. (날짜, 시작 분) 순으로 정렬되어 있어야 함
+    반환값: (선행 인덱스 배열, 후속 인덱스 배열). 인덱스는 위 정렬된 배열 기준
+
+    정렬된 두 배열을 포인터로 한 번 훑으므로 O(|pre| + |post| + 금지 쌍 수)입니다.
+    날짜별로 간격을 만족하는 선행 슬롯은 항상 앞부분에 모이므로 그 뒷부분만 금지 쌍이 됩니다.
+    정수 배열만 다루므로 numba가 있으면 njit으로 컴파일해 사용합니다 (아래 참고).
+    """
+    n_pre = len(pre_dates)
+    n_post = len(post_dates)
+
+    # 1차: 금지 쌍 개수 세기, 2차: 미리 할당한 배열에 채우기
+    out_pre = np.empty(0, dtype=np.int64)
+    out_post = np.empty(0, dtype=np.int64)
+    for fill in range(2):
+        count = 0
+        day_begin = 0 # pre[day_begin:day_end]는 현재 후속 슬롯과 같은 날짜
+        day_end = 0
+        n_ok = 0 # pre[day_begin:n_ok]는 현재 후속 슬롯과 간격을 만족
+        for j in range(n_post):
+            while day_begin < n_pre and pre_dates[day_begin] < post_dates[j]:
+                day_begin += 1
+            while day_end < n_pre and pre_dates[day_end] <= post_dates[j]:
+                day_end += 1
+            n_ok = max(n_ok, day_begin)
+            while n_ok < day_end and pre_ends[n_ok] + gap <= post_starts[j]:
+                n_ok += 1
+
+            for i in range(n_ok, day_end):
+                if fill:
+                    out_pre[count] = i
+                    out_post[count] = j
+                count += 1
+
+        if not fill:
+            out_pre = np.empty(count, dtype=np.int64)
+            out_post = np.empty(count, dtype=np.int64)
+
+    return out_pre, out_post
+
+
+if njit is not None:
+    # 컴파일 결과를 디스크에 캐시해 실행마다 JIT 비용을 다시 치르지 않도록 함
+    forbidden_gap_pairs = njit(cache=True)(forbidden_gap_pairs)
 
 
 # -----------------------------
@@ -50,30 +150,30 @@ def run_local_poc(patient_exams, next_appointment_date_str):
     # -----------------------------
     # 1) 입력 데이터 로드 및 전처리
     # -----------------------------
-    slots_data = load_data('slots_data.json') # 가능한 모든 슬롯 정보
+    # 가능한 모든 슬롯 정보 (Slot 튜플)와 같은 슬롯들의 열 단위 배열
+    slots_data, slot_columns = load_slots_with_columns('slots_data.json')
     rules_data = load_data('constraints.json') # 제약 및 전역 설정
 
     required_exams = patient_exams # 사용자가 받아야 하는 검사들
+    required_exams_set = frozenset(required_exams) # 포함 여부 확인용 (O(1) 조회)
 
     # constraints.json에 명시된 'result_waiting_days' 만큼 여유를 두고 검사 완료 기한 계산
     N_DAYS = rules_data['result_waiting_days']
-    next_appointment_date = datetime.strptime(next_appointment_date_str, '%Y-%m-%d').date()
+    next_appointment_date = date.fromisoformat(next_appointment_date_str)
     deadline_date = next_appointment_date - timedelta(days=N_DAYS)
     print(f"📌 다음 진료일: {next_appointment_date} | 검사 완료 기한: {deadline_date}")
 
-    # 검사 기한을 초과하거나, 이미 예약된 슬롯은 고려하지 않음
-    valid_slots = []
-    for slot in slots_data:
-        slot_date = datetime.strptime(slot['date'], '%Y-%m-%d').date()
-
-        # 🚨 수정된 부분: is_available 검사 조건 추가 🚨
-        is_available = slot.get('is_available', True) # 필드가 없으면 기본값 True로 간주
+    # 이후 날짜 비교는 모두 서수(int) 기준으로 수행
+    deadline_ord = deadline_date.toordinal()
 
-        # 슬롯 날짜가 데드라인 이전, 검사 종류가 필수 목록에 포함, 그리고 예약 가능할 때만 유효
-        if (slot_date <= deadline_date and 
-            slot['exam'] in required_exams and 
-            is_available):
-            valid_slots.append(slot)
+    # 검사 기한을 초과하거나, 이미 예약된 슬롯은 고려하지 않음
+    # 슬롯 날짜가 데드라인 이전, 검사 종류가 필수 목록에 포함, 그리고 예약 가능할 때만 유효
+    # (is_available 필드가 없던 슬롯은 로드 시 True로 간주됨)
+    # 세 조건을 슬롯마다 확인하지 않고 열 배열에 대한 불리언 마스크로 한 번에 계산
+    valid_mask = ((slot_columns.date_ord <= deadline_ord) &
+                  slot_columns.exam_mask(required_exams_set) &
+                  slot_columns.is_available)
+    valid_slots = [slots_data[i] for i in np.flatnonzero(valid_mask).tolist()]
 
     if not valid_slots:
         print("❌ 유효한 기간 내에 가능한 슬롯이 없습니다.")
@@ -86,6 +186,15 @@ def run_local_poc(patient_exams, next_appointment_date_str):
     # -----------------------------
     model = cp_model.CpModel()
 
+    # 규칙 중 환자의 검사 목록에 해당하는 것만 미리 골라둠 (이후 루프에서는 포함 여부를 다시 확인하지 않음)
+    constraints = rules_data['constraints']
+    cannot_rules = [(ex1_name, ex2_name) for ex1_name, ex2_name in constraints.get('cannot_same_day', [])
+                    if ex1_name in required_exams_set and ex2_name in required_exams_set]
+    must_groups = [[e for e in group if e in required_exams_set] for group in constraints.get('must_same_day', [])]
+    must_groups = [group for group in must_groups if len(group) >= 2]
+    sequence_rules = [rule for rule in constraints.get('sequence_and_gap', [])
+                      if rule['pre'] in required_exams_set and rule['post'] in required_exams_set]
+
     # 선택 변수: (exam, slot_id) 쌍에 대해 0/1 변수 생성
     # choices[(exam_name, slot_id)] = BoolVar
     choices = {}
@@ -93,13 +202,20 @@ def run_local_poc(patient_exams, next_appointment_date_str):
     # exam_slots_map: 각 검사별로 해당 가능한 슬롯들을 모아둠 (검사 -> [slot, ...])
     exam_slots_map = {e: [] for e in required_exams}
 
+    # date_to_vars: 날짜별 선택 변수 목록 (목적 함수 구성 시 사용, 날짜 서수 -> [BoolVar, ...])
+    # slot_by_id: slot_id -> slot (선형 탐색 없이 슬롯 정보를 조회하기 위함)
+    date_to_vars = {}
+    slot_by_id = {}
+
     for slot in all_slots:
-        exam = slot['exam']
-        if exam in required_exams:
+        exam = slot.exam
+        if exam in required_exams_set:
             # 슬롯 선택 여부를 표현하는 BoolVar
-            var = model.NewBoolVar(f'{exam}_in_slot_{slot["id"]}')
-            choices[(exam, slot['id'])] = var
+            var = model.NewBoolVar(f'{exam}_in_slot_{slot.id}')
+            choices[(exam, slot.id)] = var
             exam_slots_map[exam].append(slot)
+            date_to_vars.setdefault(slot.date_ord, []).append(var)
+            slot_by_id[slot.id] = slot
 
     # 제약 (1): 각 검사는 정확히 하나의 슬롯에 배정되어야 함
     for exam in required_exams:
@@ -108,77 +224,100 @@ def run_local_poc(patient_exams, next_appointment_date_str):
             print(f"ERROR: {exam}에 대한 유효한 슬롯 데이터가 없습니다.")
             return
 
-        vars_for_this_exam = [choices[(exam, slot['id'])] for slot in exam_slots_map[exam]]
-        # sum(vars) == 1: 반드시 하나의 슬롯만 선택
-        model.Add(sum(vars_for_this_exam) == 1)
+        vars_for_this_exam = [choices[(exam, slot.id)] for slot in exam_slots_map[exam]]
+        # 반드시 하나의 슬롯만 선택 (일반 선형식 sum(vars) == 1 대신 CP-SAT 고유 제약 사용)
+        model.AddExactlyOne(vars_for_this_exam)
+
+    # 날짜 채널 변수: exam_on_date[exam][date_ord] = 해당 검사가 그 날짜에 배정되었는가
+    # 검사 간 날짜 관계 제약을 슬롯 쌍(|S1|·|S2|)이 아닌 날짜 단위(|D|)로 표현하기 위해 사용
+    exam_on_date = {}
+    for exam in required_exams:
+        by_date = defaultdict(list)
+        for slot in exam_slots_map[exam]:
+            by_date[slot.date_ord].append(choices[(exam, slot.id)])
+
+        exam_on_date[exam] = {}
+        for date_ord, vars_on_date in by_date.items():
+            eod = model.NewBoolVar(f'{exam}_on_{date.fromordinal(date_ord)}')
+            # eod == max(vars_on_date): 그 날짜의 슬롯 중 하나라도 선택되면 1
+            model.AddMaxEquality(eod, vars_on_date)
+            exam_on_date[exam][date_ord] = eod
 
     # 제약 (2): cannot_same_day, must_same_day, sequence_and_gap 등 추가 제약 처리
     # (a) cannot_same_day: 규칙에 정의된 두 검사가 같은 날짜에 배정되지 않도록 함
-    for ex1_name, ex2_name in rules_data['constraints'].get('cannot_same_day', []):
-        if ex1_name in required_exams and ex2_name in required_exams:
-            for s1 in exam_slots_map[ex1_name]:
-                for s2 in exam_slots_map[ex2_name]:
-                    if s1['date'] == s2['date']:
-                        var1 = choices[(ex1_name, s1['id'])]
-                        var2 = choices[(ex2_name, s2['id'])]
-                        # 둘 다 선택되는 것을 금지 (Not A or Not B)
-                        model.AddBoolOr([var1.Not(), var2.Not()])
+    for ex1_name, ex2_name in cannot_rules:
+        for date_ord, eod1 in exam_on_date[ex1_name].items():
+            eod2 = exam_on_date[ex2_name].get(date_ord)
+            if eod2 is None:
+                continue
+            # 같은 날짜에 둘 다 배정되는 것을 금지 (Not A or Not B)
+            model.AddBoolOr([eod1.Not(), eod2.Not()])
 
     # (b) must_same_day: 그룹 내 검사들은 같은 날짜에 배정되어야 함
-    # 구현 방식: 그룹 내 서로 다른 검사 쌍에 대해 '같은 날짜가 아닐 경우' 두 변수를 동시에 선택 불가로 설정
-    for group in rules_data['constraints'].get('must_same_day', []):
-        valid_group_exams = [e for e in group if e in required_exams]
-        if len(valid_group_exams) >= 2:
-            ex1_name = valid_group_exams[0]
-            for ex2_name in valid_group_exams[1:]:
-                for s1 in exam_slots_map[ex1_name]:
-                    for s2 in exam_slots_map[ex2_name]:
-                        if s1['date'] != s2['date']:
-                            var1 = choices[(ex1_name, s1['id'])]
-                            var2 = choices[(ex2_name, s2['id'])]
-                            # 서로 다른 날짜에 배정되는 조합을 금지
-                            model.AddBoolOr([var1.Not(), var2.Not()])
+    # 구현 방식: 그룹의 첫 검사와 나머지 검사의 날짜 채널 변수가 모든 날짜에서 같도록 설정
+    for group in must_groups:
+        ex1_name = group[0]
+        for ex2_name in group[1:]:
+            group_dates = exam_on_date[ex1_name].keys() | exam_on_date[ex2_name].keys()
+            for date_ord in group_dates:
+                eod1 = exam_on_date[ex1_name].get(date_ord)
+                eod2 = exam_on_date[ex2_name].get(date_ord)
+                if eod1 is None:
+                    # ex1을 배정할 수 없는 날짜에는 ex2도 배정할 수 없음
+                    model.Add(eod2 == 0)
+                elif eod2 is None:
+                    model.Add(eod1 == 0)
+                else:
+                    model.Add(eod1 == eod2)
 
     # (c) sequence_and_gap: 선행 검사와 후속 검사 사이의 최소 시간 간격 및 날짜 순서 제약
-    for rule in rules_data['constraints'].get('sequence_and_gap', []):
+    for rule in sequence_rules:
         pre_name = rule['pre']
         post_name = rule['post']
         gap = rule['min_gap_minutes']
 
-        if pre_name in required_exams and post_name in required_exams:
-            for pre_s in exam_slots_map[pre_name]:
-                for post_s in exam_slots_map[post_name]:
-                    pre_var = choices[(pre_name, pre_s['id'])]
-                    post_var = choices[(post_name, post_s['id'])]
-
-                    # 같은 날짜인 경우: 선행 검사 종료시간 + gap <= 후속 검사 시작시간 이어야 함
-                    if pre_s['date'] == post_s['date']:
-                        if pre_s['end_min'] + gap > post_s['start_min']:
-                            # 시간 간격을 만족하지 못하면 두 변수가 동시에 1이 될 수 없음
-                            model.AddBoolOr([pre_var.Not(), post_var.Not()])
-
-                    # 날짜 순서 제약: 선행 검사 날짜가 후속 검사 날짜보다 늦으면 안 됨
-                    pre_date = datetime.strptime(pre_s['date'], '%Y-%m-%d').date()
-                    post_date = datetime.strptime(post_s['date'], '%Y-%m-%d').date()
-                    if pre_date > post_date:
-                        model.AddBoolOr([pre_var.Not(), post_var.Not()])
+        # 날짜 순서 제약: 선행 검사 날짜가 후속 검사 날짜보다 늦으면 안 됨
+        # 슬롯 쌍 대신 날짜 채널 변수 쌍에 대해서만 금지 조합을 추가하며,
+        # 후속 검사 날짜를 정렬해 두고 선행 날짜보다 이른 앞부분만 순회 (금지 조합만 방문)
+        post_on_date = exam_on_date[post_name]
+        post_dates = sorted(post_on_date)
+        for pre_date, pre_eod in exam_on_date[pre_name].items():
+            for post_date in post_dates[:bisect_left(post_dates, pre_date)]:
+                model.AddBoolOr([pre_eod.Not(), post_on_date[post_date].Not()])
+
+        # 같은 날짜인 경우: 선행 검사 종료시간 + gap <= 후속 검사 시작시간 이어야 함
+        # 슬롯을 정렬된 정수 배열로 바꿔 forbidden_gap_pairs로 금지 쌍만 계산한 뒤 제약 추가
+        pre_slots = sorted(exam_slots_map[pre_name], key=lambda s: (s.date_ord, s.end_min))
+        post_slots = sorted(exam_slots_map[post_name], key=lambda s: (s.date_ord, s.start_min))
+        pre_idx, post_idx = forbidden_gap_pairs(
+            np.fromiter((s.date_ord for s in pre_slots), dtype=np.int64, count=len(pre_slots)),
+            np.fromiter((s.end_min for s in pre_slots), dtype=np.int64, count=len(pre_slots)),
+            np.fromiter((s.date_ord for s in post_slots), dtype=np.int64, count=len(post_slots)),
+            np.fromiter((s.start_min for s in post_slots), dtype=np.int64, count=len(post_slots)),
+            gap
+        )
+
+        for i, j in zip(pre_idx.tolist(), post_idx.tolist()):
+            pre_var = choices[(pre_name, pre_slots[i].id)]
+            post_var = choices[(post_name, post_slots[j].id)]
+            # 시간 간격을 만족하지 못하면 두 변수가 동시에 1이 될 수 없음
+            model.AddBoolOr([pre_var.Not(), post_var.Not()])
 
     # -----------------------------
     # 3) 목적 함수: 방문 일수 최소화
     # - 같은 날짜에 여러 검사가 몰리면 방문 일수는 증가하지 않도록
     # - 각 날짜에 대해 '그 날짜에 적어도 한 검사가 선택되었는가'를 나타내는 BoolVar 생성
     # -----------------------------
-    all_dates = sorted(list(set(s['date'] for s in all_slots)))
     day_used_vars = []
 
-    for date_str in all_dates:
-        is_day_used = model.NewBoolVar(f'day_used_{date_str}')
-        # 해당 날짜에 배정된 모든 슬롯의 선택 변수들을 모음
-        vars_on_this_day = [v for (e, s_id), v in choices.items()
-                            if next(item for item in all_slots if item['id'] == s_id)['date'] == date_str]
+    # 변수 생성 시 날짜별로 모아둔 date_to_vars를 한 번만 순회
+    for date_ord, vars_on_this_day in sorted(date_to_vars.items()):
+        is_day_used = model.NewBoolVar(f'day_used_{date.fromordinal(date_ord)}')
 
-        # is_day_used == max(vars_on_this_day) 형태로 표현
-        model.AddMaxEquality(is_day_used, vars_on_this_day)
+        # 그 날짜의 슬롯이 하나라도 선택되면 is_day_used = 1 (v => is_day_used)
+        # 반대 방향은 필요 없음: 최소화 과정에서 쓰이지 않은 날짜의 is_day_used는 0으로 내려감
+        for v in vars_on_this_day:
+            model.AddImplication(v, is_day_used)
         day_used_vars.append(is_day_used)
 
     # 방문한 날짜 수의 합을 최소화
@@ -188,6 +327,15 @@ def run_local_poc(patient_exams, next_appointment_date_str):
     # 4) 솔버 실행 및 결과 해석
     # -----------------------------
     solver = cp_model.CpSolver()
+    # 병렬 포트폴리오 탐색: 여러 워커가 서로 다른 전략(LNS, LP 등)으로 동시에 탐색
+    solver.parameters.num_workers = available_cpu_count()
+    solver.parameters.log_search_progress = False
+    # 목적값(방문 일수)이 작은 정수이므로 최적성이 증명될 때까지 탐색
+    solver.parameters.relative_gap_limit = 0.0
+    # 재현 가능한 결과를 위해 시드를 고정하고, 워커들을 정해진 순서로 번갈아 실행
+    # (병렬 포트폴리오는 시드만으로는 실행마다 결과가 달라질 수 있음)
+    solver.parameters.random_seed = 42
+    solver.parameters.interleave_search = True
     status = solver.Solve(model)
 
     print("\n" + "=" * 50)
@@ -197,16 +345,14 @@ def run_local_poc(patient_exams, next_appointment_date_str):
 
         # 선택된 슬롯들을 읽어 사람이 읽기 쉬운 형태로 변환
         result_schedule = []
-        for slot in all_slots:
-            exam = slot['exam']
-            slot_id = slot['id']
-
-            if (exam, slot_id) in choices and solver.Value(choices[(exam, slot_id)]) == 1:
+        for (exam, slot_id), var in choices.items():
+            if solver.Value(var) == 1:
+                slot = slot_by_id[slot_id]
                 result_schedule.append({
                     "Exam": exam,
-                    "Date": slot['date'],
-                    "Start": minutes_to_time_str(slot['start_min']),
-                    "End": minutes_to_time_str(slot['end_min'])
+                    "Date": slot.date,
+                    "Start": minutes_to_time_str(slot.start_min),
+                    "End": minutes_to_time_str(slot.end_min)
                 })
 
         # 날짜/시간 순으로 정렬해서 출력
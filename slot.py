@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+
+def minutes_to_time_str(minutes):
+    """
+    분 단위 정수를 'HH:MM' 형식의 문자열로 변환합니다.
+
+    예: 75 -> '01:15'
+    이 함수는 출력용으로만 사용되며 내부 계산은 분 단위를 유지합니다.
+    """
+    hours = minutes // 60
+    mins = minutes % 60
+    return f"{hours:02d}:{mins:02d}"
+
+
+@dataclass(slots=True)
+class Slot:
+    """
+    검사 슬롯 한 개를 나타내는 레코드.
+
+    dict 대신 __slots__ 기반 클래스를 사용해 슬롯당 메모리를 줄이고,
+    제약 생성 루프에서 반복되는 필드 접근을 해시 조회가 아닌 속성 접근으로 처리합니다.
+
+    - date: 'YYYY-MM-DD' 형식의 날짜 문자열 (JSON에 기록되는 값)
+    - date_ord: date의 서수(date.toordinal()) 값. 날짜 비교/그룹화에 사용하며 JSON에는 기록하지 않음
+    - day: 생성 기간 첫날을 1로 하는 일차
+    - time_status_display: 출력용 문자열 (예: '09:00-09:30, 예약 가능'), 없으면 None
+    """
+    id: int
+    exam: str
+    date: str
+    date_ord: int
+    day: int
+    start_min: int
+    end_min: int
+    is_available: bool = True
+    time_status_display: str | None = None
+
+    @classmethod
+    def from_dict(cls, record):
+        """slots_data.json의 항목(dict)을 Slot으로 변환합니다. is_available이 없으면 True로 간주합니다."""
+        return cls(
+            id=record['id'],
+            exam=record['exam'],
+            date=record['date'],
+            date_ord=date.fromisoformat(record['date']).toordinal(),
+            day=record['day'],
+            start_min=record['start_min'],
+            end_min=record['end_min'],
+            is_available=record.get('is_available', True),
+            time_status_display=record.get('time_status_display'),
+        )
+
+    def to_dict(self):
+        """JSON 출력용 dict로 변환합니다. date_ord는 제외하고, time_status_display는 값이 있을 때만 포함합니다."""
+        record = {
+            "id": self.id,
+            "exam": self.exam,
+            "date": self.date,
+            "day": self.day,
+            "start_min": self.start_min,
+            "end_min": self.end_min,
+            "is_available": self.is_available
+        }
+        if self.time_status_display is not None:
+            record["time_status_display"] = self.time_status_display
+        return record
+
+
+@dataclass(frozen=True)
+class SlotColumns:
+    """
+    Slot 목록을 열(column) 단위 NumPy 배열로 보관하는 표현 (SoA).
+
+    같은 슬롯 목록을 여러 조건으로 반복해서 거를 때, 슬롯마다 속성을 확인하는 대신
+    불리언 마스크 연산 한 번으로 처리하기 위해 사용합니다. i번째 원소는 원래 목록의 i번째 슬롯에 대응합니다.
+
+    - exam_code: exam_names에서의 검사 이름 인덱스
+    """
+    exam_code: np.ndarray
+    date_ord: np.ndarray
+    is_available: np.ndarray
+    exam_names: tuple
+
+    @classmethod
+    def from_slots(cls, slots):
+        """Slot 목록(list 또는 tuple)으로부터 열 배열을 만듭니다."""
+        count = len(slots)
+        exam_names = tuple(sorted({slot.exam for slot in slots}))
+        code_of = {name: code for code, name in enumerate(exam_names)}
+        return cls(
+            exam_code=np.fromiter((code_of[slot.exam] for slot in slots), dtype=np.int32, count=count),
+            date_ord=np.fromiter((slot.date_ord for slot in slots), dtype=np.int32, count=count),
+            is_available=np.fromiter((slot.is_available for slot in slots), dtype=bool, count=count),
+            exam_names=exam_names,
+        )
+
+    def exam_mask(self, exams):
+        """검사 이름이 exams에 포함되는 슬롯에 대해 True인 불리언 마스크를 반환합니다."""
+        codes = [code for code, name in enumerate(self.exam_names) if name in exams]
+        return np.isin(self.exam_code, codes)
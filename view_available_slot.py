@@ -1,15 +1,36 @@
-import json
+try:
+    import ijson # 스트리밍 JSON 파서 (설치되어 있으면 사용)
+except ImportError:
+    ijson = None
 
-# JSON 파일 읽기
-with open('slots_data.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+from jsonio import dumps_compact, read_json
 
-# is_available이 true인 것만 필터링
-available_slots = [item for item in data if item.get('is_available') == True]
 
-# 결과를 새 JSON 파일로 저장
-with open('available_slots_data.json', 'w', encoding='utf-8') as f:
-    json.dump(available_slots, f, ensure_ascii=False, indent=2)
+def iter_slots(filename):
+    """
+    슬롯 JSON 파일의 항목을 하나씩 반환합니다.
+    ijson이 있으면 파일을 스트리밍으로 파싱하고, 없으면 파일 전체를 한 번 파싱한 뒤 순회합니다.
+    """
+    if ijson is not None:
+        with open(filename, 'rb') as f:
+            yield from ijson.items(f, 'item')
+    else:
+        yield from read_json(filename)
 
-print(f"총 {len(available_slots)}개의 예약 가능한 슬롯을 찾았습니다.")
+
+# JSON 파일을 읽으면서 is_available이 true인 것만 골라 바로 새 JSON 파일로 저장
+# ijson이 있으면 항목을 하나씩 파싱하므로 전체 목록도, 필터링된 목록도 메모리에 올리지 않음
+# 출력 형식은 generate_slots.py의 모드 1과 같음 (항목별 한 줄, 압축)
+available_count = 0
+with open('available_slots_data.json', 'wb', buffering=1 << 20) as fout:
+    fout.write(b"[\n")
+    for item in iter_slots('slots_data.json'):
+        if item.get('is_available') is True:
+            if available_count:
+                fout.write(b",\n")
+            fout.write(dumps_compact(item))
+            available_count += 1
+    fout.write(b"\n]")
+
+print(f"총 {available_count}개의 예약 가능한 슬롯을 찾았습니다.")
 print(f"결과가 'available_slots_data.json' 파일로 저장되었습니다.")
\ No newline at end of file